@@ -10,18 +10,27 @@ CRITICAL: This is the FastAPI server that spawns mcp_server.py as a subprocess.
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
 from contextlib import asynccontextmanager
-from typing import Dict, Any
-from datetime import datetime
-import json
+from typing import Dict, Any, Optional, Callable, Awaitable
+from datetime import datetime, timezone
+import orjson
 import logging
+import asyncio
+import functools
+import re
+import time
+import anyio
+import httpx
 
 # MCP imports
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
 # OpenAI imports
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 # Configuration
 import config
@@ -33,23 +42,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
+# Initialize OpenAI client on one shared, explicitly sized connection pool.
+# HTTP/2 lets concurrent streamed completions multiplex over one TLS connection.
+openai_client = AsyncOpenAI(
+    api_key=config.OPENAI_API_KEY,
+    http_client=DefaultAsyncHttpxClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=25),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+    ),
+)
 
 
 # ========== LIFESPAN MANAGER (CRITICAL) ==========
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+async def run_mcp_session(app: FastAPI, shutdown: anyio.Event, *, task_status=anyio.TASK_STATUS_IGNORED):
     """
-    Lifespan manager that spawns mcp_server.py as subprocess on startup
-    and cleans up on shutdown.
+    Own the MCP subprocess + ClientSession for the whole app lifetime.
     
-    The MCP session is stored in app.state.mcp_session and reused across
-    all requests (NOT per-request).
+    Runs as a background task in the lifespan task group, so the stdio
+    pipes and the session's receive loop are not tied to the lifespan task
+    or to any request task. ClientSession multiplexes concurrent
+    call_tool() requests by id over its write stream, so request handlers
+    can share the session without extra locking.
     """
-    logger.info("🚀 Starting FastAPI application...")
-    
     # Configure subprocess parameters to spawn mcp_server.py
     import sys
     server_params = StdioServerParameters(
@@ -70,28 +86,61 @@ async def lifespan(app: FastAPI):
             logger.info("✅ MCP server started and session initialized")
             logger.info(f"✅ MCP session stored in app.state.mcp_session")
             
-            # List available tools for debugging
+            # List available tools once and cache their OpenAI schema
+            # (tools are registered at MCP startup, so this never changes). The same
+            # list object is handed to every chat.completions.create() call.
+            app.state.openai_tools = []
             try:
-                tools_list = await session.list_tools()
-                tool_names = [tool.name for tool in tools_list.tools]
+                app.state.openai_tools = await convert_mcp_tools_to_openai_schema(session)
+                tool_names = [tool["function"]["name"] for tool in app.state.openai_tools]
                 logger.info(f"📋 Available MCP tools: {tool_names}")
+                logger.info(f"✅ Cached {len(app.state.openai_tools)} OpenAI tool schemas in app.state.openai_tools")
             except Exception as e:
                 logger.error(f"Failed to list MCP tools: {e}")
             
-            # Server runs here - yield control to FastAPI
-            yield
+            # Session is ready - unblock the lifespan, then hold it open until shutdown
+            task_status.started()
+            await shutdown.wait()
             
-            # Cleanup on shutdown (automatic via context managers)
             logger.info("🛑 Shutting down MCP server...")
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Lifespan manager that spawns mcp_server.py as subprocess on startup
+    and cleans up on shutdown.
+    
+    The MCP session is stored in app.state.mcp_session and reused across
+    all requests (NOT per-request). It is owned by a background task in
+    app.state.mcp_tg (see run_mcp_session).
+    """
+    logger.info("🚀 Starting FastAPI application...")
+    
+    shutdown = anyio.Event()
+    async with anyio.create_task_group() as tg:
+        app.state.mcp_tg = tg
+        
+        # Returns once the session is initialized (raises if startup fails)
+        await tg.start(run_mcp_session, app, shutdown)
+        
+        try:
+            # Server runs here - yield control to FastAPI
+            yield
+        finally:
+            # Cleanup on shutdown (context managers close inside the owner task)
+            shutdown.set()
+            await openai_client.close()
+
+
 # ========== FASTAPI APP INITIALIZATION ==========
 
 app = FastAPI(
     title="Dreamwell Influencer Agent API",
     description="AI agent system for automating influencer email responses",
     version="1.0.0",
-    lifespan=lifespan  # CRITICAL: Attach lifespan manager
+    lifespan=lifespan,  # CRITICAL: Attach lifespan manager
+    default_response_class=ORJSONResponse  # orjson-backed response serialization
 )
 
 # ⚠️ CRITICAL: Configure CORS immediately after app creation (Rule 5)
@@ -105,9 +154,106 @@ app.add_middleware(
 
 logger.info("✅ CORS middleware configured")
 
+# Compress larger JSON payloads (e.g. /api/emails); tiny responses go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+# ========== REQUEST MODELS ==========
+
+class GenerateRequest(BaseModel):
+    """Body for /api/generate and /api/generate/stream"""
+    thread_id: str
+    brand_id: str = "perplexity"
+
+
+class SendRequest(BaseModel):
+    """Body for /api/send"""
+    thread_id: str
+    content: str
+
 
 # ========== HELPER FUNCTIONS ==========
 
+def _extract_mcp_text(result) -> Optional[str]:
+    """
+    Text of the first content item of an MCP CallToolResult.
+    
+    Our tools always return a single TextContent, so direct attribute
+    access with one emptiness guard is enough.
+    """
+    content = getattr(result, "content", None)
+    return content[0].text if content else None
+
+
+def _extract_mcp_json(result) -> Optional[Any]:
+    """Parse the JSON payload of an MCP CallToolResult (None if empty)"""
+    text = _extract_mcp_text(result)
+    return orjson.loads(text) if text else None
+
+
+# Short-lived cache for the email read endpoints: key -> (expires_at, response)
+email_cache: Dict[tuple, tuple] = {}
+# Bumped on every invalidation, so a read that started before a write can't re-cache stale data
+email_cache_generation = 0
+
+# MCP tools that change thread state (and so invalidate the email cache)
+EMAIL_WRITE_TOOLS = {"send_reply", "mark_as_processed"}
+
+
+def _email_cache_get(key: tuple) -> Optional[Any]:
+    """Cached response for key, or None if missing/expired"""
+    entry = email_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _email_cache_put(key: tuple, value: Any, generation: int) -> None:
+    """Cache value for key, unless the cache was invalidated since generation was read"""
+    if generation != email_cache_generation:
+        return
+    now = time.monotonic()
+    if len(email_cache) >= config.EMAIL_CACHE_MAX_ENTRIES:
+        # Prune expired entries first, then evict the oldest if still full
+        for stale in [k for k, entry in email_cache.items() if entry[0] <= now]:
+            del email_cache[stale]
+        if len(email_cache) >= config.EMAIL_CACHE_MAX_ENTRIES:
+            email_cache.pop(next(iter(email_cache)))
+    email_cache[key] = (now + config.EMAIL_CACHE_TTL_SECONDS, value)
+
+
+def _invalidate_email_cache(thread_id: Optional[str]) -> None:
+    """Drop the thread and every email list after a write touches thread_id"""
+    global email_cache_generation
+    email_cache_generation += 1
+    email_cache.pop(("thread", thread_id), None)
+    for key in [key for key in email_cache if key[0] == "emails"]:
+        del email_cache[key]
+
+
+async def call_mcp_tool(name: str, arguments: Dict[str, Any]):
+    """
+    Call a tool on the shared MCP session, bounded by config.TOOL_TIMEOUT_SECONDS.
+    
+    A stalled MCP subprocess raises asyncio.TimeoutError instead of
+    hanging the request (and every other request queued behind it).
+    Write tools (EMAIL_WRITE_TOOLS) invalidate the email cache whoever
+    calls them - the /api/send endpoint or the agent loop.
+    """
+    try:
+        return await asyncio.wait_for(
+            app.state.mcp_session.call_tool(name, arguments),
+            timeout=config.TOOL_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"⏱️ MCP tool {name} timed out after {config.TOOL_TIMEOUT_SECONDS}s")
+        raise asyncio.TimeoutError(f"MCP tool '{name}' timed out after {config.TOOL_TIMEOUT_SECONDS}s") from None
+    finally:
+        # The thread may have changed even if the call failed or timed out
+        if name in EMAIL_WRITE_TOOLS:
+            _invalidate_email_cache(arguments.get("thread_id"))
+
+
 def mcp_tool_to_openai_schema(mcp_tool) -> Dict[str, Any]:
     """
     Convert an MCP tool to OpenAI function schema.
@@ -135,29 +281,157 @@ async def convert_mcp_tools_to_openai_schema(session: ClientSession) -> list:
     return openai_tools
 
 
-# ========== AGENT ORCHESTRATOR (ReAct Loop - Day 2) ==========
+# Category keywords, checked in priority order (first keyword found wins)
+_CATEGORY_RE = re.compile(r"negotiat|accept|decline", re.IGNORECASE)
+_CATEGORY_PRIORITY = (
+    ("negotiat", "negotiation"),
+    ("accept", "acceptance"),
+    ("decline", "rejection"),
+)
+
 
-async def agent_orchestrator(email_context: Dict[str, Any], brand_id: str) -> Dict[str, Any]:
+def derive_category(content: Optional[str]) -> str:
     """
-    Agent Orchestrator using ReAct Loop Pattern.
+    Default category derivation (simple keyword match on the draft).
     
-    1. Converts MCP tools to OpenAI schema
-    2. Enters reasoning loop (max 5 iterations)
-    3. Calls LLM with message history
-    4. Executes chosen tools via MCP
-    5. Returns final response
+    One case-insensitive regex pass over the draft instead of lowercasing
+    the whole string and scanning it once per keyword.
+    """
+    if not content:
+        return "response"
+    
+    # Only the short matched keywords are lowercased, never the draft itself;
+    # stop at the first top-priority hit instead of collecting every match
+    found = set()
+    top_keyword = _CATEGORY_PRIORITY[0][0]
+    for match in _CATEGORY_RE.finditer(content):
+        keyword = match.group().lower()
+        if keyword == top_keyword:
+            return _CATEGORY_PRIORITY[0][1]
+        found.add(keyword)
+    
+    for keyword, category in _CATEGORY_PRIORITY:
+        if keyword in found:
+            return category
+    return "response"
+
+
+def _is_complete_json_object(raw: str) -> bool:
+    """True once streamed tool-call arguments form a complete JSON object"""
+    try:
+        return isinstance(orjson.loads(raw), dict)
+    except orjson.JSONDecodeError:
+        return False
+
+
+async def stream_chat_completion(
+    messages: list,
+    tools: list,
+    on_tool_call_ready: Callable[[Dict[str, Any]], None],
+    on_content_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+    on_content_reset: Optional[Callable[[], Awaitable[None]]] = None
+):
     """
-    session = app.state.mcp_session
-    openai_tools = await convert_mcp_tools_to_openai_schema(session)
+    Stream one chat completion and accumulate content + tool-call deltas.
+    
+    on_tool_call_ready(call) fires as soon as a tool call's arguments are a
+    complete JSON object, so MCP execution overlaps the remaining decode.
+    on_content_delta(text) receives content tokens as they arrive, until a
+    tool call shows up: text in a tool-calling turn is narration ("Let me
+    look that up"), not the draft, so forwarding stops and on_content_reset()
+    fires if any of it was already sent.
+    
+    Returns:
+        (content, tool_calls) where tool_calls is a list of
+        {"id", "name", "arguments"} dicts in the order the model emitted them
+    """
+    stream = await openai_client.chat.completions.create(
+        model="gpt-4o",
+        messages=messages,
+        tools=tools,
+        tool_choice="auto",
+        stream=True,
+        stream_options={"include_usage": True}  # Final chunk reports token usage
+    )
+    
+    content_parts = []
+    tool_calls: Dict[int, Dict[str, Any]] = {}  # delta index -> accumulated call
+    dispatched = set()
+    streamed_text = False
+    saw_tool_call = False
+    
+    async for chunk in stream:
+        if chunk.usage:
+            # Iterations 2+ should hit OpenAI's prompt cache on the stable system/user prefix
+            details = chunk.usage.prompt_tokens_details
+            cached_tokens = (details.cached_tokens or 0) if details else 0
+            logger.info(
+                "📊 Tokens: prompt=%s (cached=%s) completion=%s",
+                chunk.usage.prompt_tokens, cached_tokens, chunk.usage.completion_tokens
+            )
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        
+        # Bind Pydantic attributes to locals once per chunk
+        text = delta.content
+        tc_deltas = delta.tool_calls
+        if text:
+            content_parts.append(text)
+            if on_content_delta and not saw_tool_call and not tc_deltas:
+                await on_content_delta(text)
+                streamed_text = True
+        
+        if tc_deltas and not saw_tool_call:
+            saw_tool_call = True
+            if streamed_text and on_content_reset:
+                await on_content_reset()
+        
+        for tc_delta in tc_deltas or []:
+            index = tc_delta.index
+            call_id = tc_delta.id
+            fn = tc_delta.function
+            
+            call = tool_calls.setdefault(index, {"id": None, "name": "", "arguments": ""})
+            if call_id:
+                call["id"] = call_id
+            if fn:
+                fn_name, fn_args = fn.name, fn.arguments
+                if fn_name:
+                    call["name"] += fn_name
+                if fn_args:
+                    call["arguments"] += fn_args
+            
+            if (index not in dispatched and call["id"] and call["name"]
+                    and _is_complete_json_object(call["arguments"])):
+                dispatched.add(index)
+                on_tool_call_ready(call)
+    
+    # Anything not dispatched early (e.g. malformed arguments) goes out now;
+    # a call the stream never gave an id or name can't be run or answered
+    ordered_calls = []
+    for index in sorted(tool_calls):
+        call = tool_calls[index]
+        if not call["id"] or not call["name"]:
+            logger.warning("⚠️ Skipping incomplete streamed tool call: %s", call)
+            continue
+        ordered_calls.append(call)
+        if index not in dispatched:
+            on_tool_call_ready(call)
     
-    # System Prompt
-    system_prompt = f"""You are an expert influencer marketing manager for {brand_id}.
+    return "".join(content_parts) or None, ordered_calls
+
+
+# ========== AGENT ORCHESTRATOR (ReAct Loop - Day 2) ==========
+
+# System Prompt (only the brand varies, so render once per brand)
+_PROMPT_TEMPLATE = """You are an expert influencer marketing manager for {brand}.
     Your goal is to analyze the email and generate a professional response.
     
     MANDATORY TOOL CALLS (you MUST call ALL of these in order):
     1. fetch_channel_data - Get the influencer's YouTube metrics
     2. detect_fake_engagement - Check for fake followers/engagement (REQUIRED!)
-    3. get_brand_context - Get budget and guidelines for {brand_id}
+    3. get_brand_context - Get budget and guidelines for {brand}
     4. calculate_offer_price - Calculate fair CPM-based price (REQUIRED!)
     5. forecast_campaign_roi - Predict expected revenue and ROAS (REQUIRED!)
     6. validate_counter_offer - If they proposed a price, validate it
@@ -180,13 +454,43 @@ async def agent_orchestrator(email_context: Dict[str, Any], brand_id: str) -> Di
     NO other text. NO preamble. NO bullet points. NO questions.
     JUST the email that would be sent to the influencer."""
 
+
+@functools.lru_cache(maxsize=32)
+def _system_prompt(brand_id: str) -> str:
+    """Rendered system prompt for a brand (cached; strings are immutable)"""
+    return _PROMPT_TEMPLATE.format(brand=brand_id)
+
+
+async def agent_orchestrator(
+    email_context: Dict[str, Any],
+    brand_id: str,
+    on_content_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+    on_content_reset: Optional[Callable[[], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """
+    Agent Orchestrator using ReAct Loop Pattern.
+    
+    1. Uses the OpenAI tool schema cached at startup (app.state.openai_tools)
+    2. Enters reasoning loop (max 5 iterations)
+    3. Streams the LLM reply for the current message history
+    4. Executes chosen tools via MCP as soon as their arguments stream in
+    5. Returns final response
+    
+    on_content_delta, if given, receives draft tokens as they are generated;
+    on_content_reset() means the tokens sent so far were not the draft.
+    """
+    openai_tools = app.state.openai_tools
+    
     # Initialize Message History
+    # system + user form the prompt-cache prefix: built once, never mutated, and
+    # serialized with sorted keys so the bytes don't depend on dict ordering
     messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": f"Email Context: {json.dumps(email_context)}"}
+        {"role": "system", "content": _system_prompt(brand_id)},
+        {"role": "user", "content": f"Email Context: {orjson.dumps(email_context, option=orjson.OPT_SORT_KEYS).decode()}"}
     ]
     
     MAX_ITERATIONS = 5
+    final_content = None
     pricing_breakdown = None
     roi_forecast = None
     authenticity_data = None
@@ -196,129 +500,154 @@ async def agent_orchestrator(email_context: Dict[str, Any], brand_id: str) -> Di
     for i in range(MAX_ITERATIONS):
         logger.info(f"🔄 Iteration {i+1}/{MAX_ITERATIONS}")
         
-        # 1. Call LLM
-        response = await openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            tools=openai_tools,
-            tool_choice="auto"
-        )
-        
-        assistant_msg = response.choices[0].message
-        messages.append(assistant_msg)
-        
-        # 2. Check for Tool Calls
-        if not assistant_msg.tool_calls:
-            logger.info("✅ Agent finished reasoning (no more tool calls)")
-            break
-            
-        # 3. Execute Tools
-        for tool_call in assistant_msg.tool_calls:
+        # Execute one tool call via MCP (started while the completion is still streaming)
+        async def _run_one(tool_call):
+            """Execute one tool call via MCP. Returns (tool message, tool name, text output)."""
             try:
-                t_name = tool_call.function.name
-                t_args = json.loads(tool_call.function.arguments)
+                t_name = tool_call["name"]
+                t_args = orjson.loads(tool_call["arguments"])
                 
-                logger.info(f"🛠️ Agent calling: {t_name}({t_args})")
+                logger.info("🛠️ Agent calling: %s(%s)", t_name, t_args)
                 
                 # Execute via MCP
-                result = await session.call_tool(t_name, t_args)
-                
-                # Capture pricing data if available (for UI)
-                if t_name == "calculate_offer_price" and hasattr(result, 'content'):
-                     # MCP returns content list, need to parse
-                     pass 
+                result = await call_mcp_tool(t_name, t_args)
                 
-                # Parse MCP result to string/dict for LLM
+                # Parse MCP result to string for LLM
                 # MCP results come as objects with 'content', 'isError'
-                tool_output = "Error executing tool"
-                if hasattr(result, 'content') and len(result.content) > 0:
-                     if hasattr(result.content[0], 'text'):
-                         tool_output = result.content[0].text
-                         
-                         # Capture pricing breakdown from tool output for UI
-                         if t_name == "calculate_offer_price":
-                             try:
-                                 data = json.loads(tool_output)
-                                 if data.get("success"):
-                                     calc = data.get("calculation", {})
-                                     mults = calc.get("multipliers", {})
-                                     rec = data.get("recommendation", {})
-                                     # Map to flat structure frontend expects
-                                     pricing_breakdown = {
-                                         "recommended_offer": rec.get("offer_price", calc.get("estimated_total_price", 0)),
-                                         "engagement_multiplier": mults.get("engagement", 1.0),
-                                         "niche_multiplier": mults.get("niche", 1.0),
-                                         "consistency_multiplier": mults.get("consistency", 1.0),
-                                         "base_cpm": mults.get("base_cpm", 10),
-                                         "final_cpm": calc.get("final_cpm", 10),
-                                         "metrics": calc.get("metrics", {}),
-                                     }
-                             except:
-                                 pass
-                         
-                         # Capture ROI forecast for UI
-                         if t_name == "forecast_campaign_roi":
-                             try:
-                                 data = json.loads(tool_output)
-                                 if data.get("success"):
-                                     forecast = data.get("forecast", {})
-                                     roi_forecast = {
-                                         "estimated_revenue": forecast.get("estimated_revenue", 0),
-                                         "roas": forecast.get("roas", 0),
-                                         "estimated_conversions": forecast.get("estimated_conversions", 0),
-                                         "assessment": forecast.get("assessment", ""),
-                                         "confidence_score": forecast.get("confidence_score", 0.7),
-                                     }
-                             except:
-                                 pass
-                         
-                         # Capture authenticity analysis for UI
-                         if t_name == "detect_fake_engagement":
-                             try:
-                                 data = json.loads(tool_output)
-                                 if data.get("success"):
-                                     analysis = data.get("analysis", {})
-                                     authenticity_data = {
-                                         "score": analysis.get("authenticity_score", 100),
-                                         "assessment": analysis.get("assessment", ""),
-                                         "recommendation": analysis.get("recommendation", ""),
-                                         "red_flags": analysis.get("red_flags", []),
-                                     }
-                             except:
-                                 pass
-                     else:
-                         tool_output = str(result.content[0])
-                else:
-                    tool_output = str(result)
+                text_output = _extract_mcp_text(result)
+                tool_output = text_output if text_output is not None else str(result)
                 
-                logger.info(f"📤 Tool Output: {tool_output[:200]}...") # Log partial output
+                logger.info("📤 Tool Output: %.200s...", tool_output) # Log partial output
                 
-                messages.append({
+                return {
                     "role": "tool",
-                    "tool_call_id": tool_call.id,
+                    "tool_call_id": tool_call["id"],
                     "content": tool_output
-                })
+                }, t_name, text_output
                 
             except Exception as e:
                 logger.error(f"❌ Tool Execution Error: {e}")
-                messages.append({
+                return {
                     "role": "tool",
-                    "tool_call_id": tool_call.id,
+                    "tool_call_id": tool_call["id"],
                     "content": f"Error: {str(e)}"
+                }, None, None
+        
+        tool_tasks: Dict[str, asyncio.Task] = {}
+        
+        def _dispatch(tool_call):
+            tool_tasks[tool_call["id"]] = asyncio.create_task(_run_one(tool_call))
+        
+        # 1. Stream LLM reply, dispatching tools as their arguments complete
+        try:
+            content, tool_calls = await stream_chat_completion(
+                messages, openai_tools, _dispatch, on_content_delta, on_content_reset
+            )
+        except BaseException:
+            for task in tool_tasks.values():
+                task.cancel()
+            raise
+        
+        # Echo the reply back as a minimal dict (role/content/tool_calls only) so the
+        # SDK doesn't re-serialize a full ChatCompletionMessage on every iteration
+        assistant_msg = {"role": "assistant", "content": content}
+        if tool_calls:
+            assistant_msg["tool_calls"] = [
+                {
+                    "id": tc["id"],
+                    "type": "function",
+                    "function": {"name": tc["name"], "arguments": tc["arguments"]}
+                }
+                for tc in tool_calls
+            ]
+        messages.append(assistant_msg)
+        final_content = content
+        
+        # 2. Check for Tool Calls
+        if not tool_calls:
+            logger.info("✅ Agent finished reasoning (no more tool calls)")
+            break
+        
+        # 3. Collect tool results (already running concurrently)
+        # gather() preserves input order, so tool messages stay aligned with tool_call ids
+        results = await asyncio.gather(
+            *(tool_tasks[tc["id"]] for tc in tool_calls),
+            return_exceptions=True
+        )
+        
+        for tool_call, outcome in zip(tool_calls, results):
+            if isinstance(outcome, BaseException):
+                logger.error(f"❌ Tool Execution Error: {outcome}")
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call["id"],
+                    "content": f"Error: {str(outcome)}"
                 })
+                continue
+            
+            tool_message, t_name, tool_output = outcome
+            messages.append(tool_message)
+            
+            if tool_output is None:
+                continue
+            
+            # Capture pricing breakdown from tool output for UI
+            if t_name == "calculate_offer_price":
+                try:
+                    data = orjson.loads(tool_output)
+                    if data.get("success"):
+                        calc = data.get("calculation", {})
+                        mults = calc.get("multipliers", {})
+                        rec = data.get("recommendation", {})
+                        # Map to flat structure frontend expects
+                        pricing_breakdown = {
+                            "recommended_offer": rec.get("offer_price", calc.get("estimated_total_price", 0)),
+                            "engagement_multiplier": mults.get("engagement", 1.0),
+                            "niche_multiplier": mults.get("niche", 1.0),
+                            "consistency_multiplier": mults.get("consistency", 1.0),
+                            "base_cpm": mults.get("base_cpm", 10),
+                            "final_cpm": calc.get("final_cpm", 10),
+                            "metrics": calc.get("metrics", {}),
+                        }
+                except:
+                    pass
+            
+            # Capture ROI forecast for UI
+            if t_name == "forecast_campaign_roi":
+                try:
+                    data = orjson.loads(tool_output)
+                    if data.get("success"):
+                        forecast = data.get("forecast", {})
+                        roi_forecast = {
+                            "estimated_revenue": forecast.get("estimated_revenue", 0),
+                            "roas": forecast.get("roas", 0),
+                            "estimated_conversions": forecast.get("estimated_conversions", 0),
+                            "assessment": forecast.get("assessment", ""),
+                            "confidence_score": forecast.get("confidence_score", 0.7),
+                        }
+                except:
+                    pass
+            
+            # Capture authenticity analysis for UI
+            if t_name == "detect_fake_engagement":
+                try:
+                    data = orjson.loads(tool_output)
+                    if data.get("success"):
+                        analysis = data.get("analysis", {})
+                        authenticity_data = {
+                            "score": analysis.get("authenticity_score", 100),
+                            "assessment": analysis.get("assessment", ""),
+                            "recommendation": analysis.get("recommendation", ""),
+                            "red_flags": analysis.get("red_flags", []),
+                        }
+                except:
+                    pass
 
-    # Default category derivation (simple)
-    category = "response"
-    last_content = messages[-1].content
-    if last_content:
-        lower_content = last_content.lower()
-        if "negotiat" in lower_content: category = "negotiation"
-        elif "accept" in lower_content: category = "acceptance"
-        elif "decline" in lower_content: category = "rejection"
+    category = derive_category(final_content)
     
     return {
         "category": category,
-        "response_draft": messages[-1].content,
+        "response_draft": final_content,
         "pricing_breakdown": pricing_breakdown,
         "roi_forecast": roi_forecast,
         "authenticity_data": authenticity_data,
@@ -354,18 +683,12 @@ async def health_check():
     # Check MCP session
     mcp_session_active = hasattr(app.state, 'mcp_session') and app.state.mcp_session is not None
 
-    # Get tool count if session is active
-    tool_count = 0
-    if mcp_session_active:
-        try:
-            tools_list = await app.state.mcp_session.list_tools()
-            tool_count = len(tools_list.tools)
-        except:
-            pass
+    # Tool count from the schema list cached at startup (no MCP round-trip)
+    tool_count = len(getattr(app.state, "openai_tools", None) or []) if mcp_session_active else 0
 
     health_status = {
         "status": "healthy" if (mcp_session_active and openai_key_present) else "degraded",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
         "components": {
             "mcp_server": {
                 "status": "up" if mcp_session_active else "down",
@@ -400,8 +723,6 @@ async def test_youtube_api(channel_handle: str):
     logger.info(f"Testing YouTube API with channel: {channel_handle}")
 
     try:
-        session = app.state.mcp_session
-
         # Construct URL
         if not channel_handle.startswith("http"):
             channel_url = f"https://www.youtube.com/{channel_handle}"
@@ -409,29 +730,26 @@ async def test_youtube_api(channel_handle: str):
             channel_url = channel_handle
 
         # Call MCP tool
-        result = await session.call_tool("fetch_channel_data", {"channel_url": channel_url})
+        result = await call_mcp_tool("fetch_channel_data", {"channel_url": channel_url})
 
         # Parse result
-        if hasattr(result, 'content') and len(result.content) > 0:
-            content_item = result.content[0]
-            if hasattr(content_item, 'text'):
-                data = json.loads(content_item.text)
-
-                # Add helpful metadata
-                if data.get("success"):
-                    source = data.get("source", "unknown")
-                    data["test_info"] = {
-                        "using_real_api": source == "api",
-                        "using_fallback": source == "local_fallback",
-                        "data_source": source,
-                        "explanation": (
-                            "✅ Successfully fetched from YouTube Data API v3" if source == "api"
-                            else "⚠️ Using local fallback data (API key not configured or quota exceeded)" if source == "local_fallback"
-                            else "❓ Unknown data source"
-                        )
-                    }
-
-                return data
+        data = _extract_mcp_json(result)
+        if data is not None:
+            # Add helpful metadata
+            if data.get("success"):
+                source = data.get("source", "unknown")
+                data["test_info"] = {
+                    "using_real_api": source == "api",
+                    "using_fallback": source == "local_fallback",
+                    "data_source": source,
+                    "explanation": (
+                        "✅ Successfully fetched from YouTube Data API v3" if source == "api"
+                        else "⚠️ Using local fallback data (API key not configured or quota exceeded)" if source == "local_fallback"
+                        else "❓ Unknown data source"
+                    )
+                }
+
+            return data
 
         return {"success": False, "error": "Invalid response format"}
 
@@ -453,21 +771,23 @@ async def list_emails(limit: int = 20):
     """
     logger.info(f"GET /api/emails called with limit={limit}")
     
+    limit = max(0, min(limit, config.EMAIL_LIST_MAX_LIMIT))
+    cached = _email_cache_get(("emails", limit))
+    if cached is not None:
+        return cached
+    
+    generation = email_cache_generation
     try:
-        session = app.state.mcp_session
-        
         # Call MCP tool (async!)
-        result = await session.call_tool("get_latest_emails", {"limit": limit})
+        result = await call_mcp_tool("get_latest_emails", {"limit": limit})
         
-        logger.info(f"MCP tool returned: {result}")
+        logger.info("MCP tool returned: %r", result)
         
         # Extract content from MCP result
-        if hasattr(result, 'content') and len(result.content) > 0:
-            # MCP returns results in content array
-            content_item = result.content[0]
-            if hasattr(content_item, 'text'):
-                data = json.loads(content_item.text)
-                return data
+        data = _extract_mcp_json(result)
+        if data is not None:
+            _email_cache_put(("emails", limit), data, generation)
+            return data
         
         # Fallback if format is different
         return result
@@ -490,32 +810,35 @@ async def get_email_thread(thread_id: str):
     """
     logger.info(f"GET /api/emails/{thread_id} called")
     
+    cached = _email_cache_get(("thread", thread_id))
+    if cached is not None:
+        return cached
+    
+    generation = email_cache_generation
     try:
-        session = app.state.mcp_session
-        
         # Call MCP tool (async!)
-        result = await session.call_tool("get_email_thread", {"thread_id": thread_id})
+        result = await call_mcp_tool("get_email_thread", {"thread_id": thread_id})
         
-        logger.info(f"MCP tool returned: {result}")
+        logger.info("MCP tool returned: %r", result)
         
         # Extract content from MCP result
-        if hasattr(result, 'content') and len(result.content) > 0:
-            content_item = result.content[0]
-            if hasattr(content_item, 'text'):
-                data = json.loads(content_item.text)
-                if not data.get("success"):
-                    raise HTTPException(status_code=404, detail=data.get("error"))
-                
-                # Map 'thread' to 'messages' for frontend compatibility
-                email_data = data.get("data", {})
-                if "thread" in email_data and "messages" not in email_data:
-                    email_data["messages"] = email_data["thread"]
-                
-                # Also extract subject from first message if not present
-                if not email_data.get("subject") and email_data.get("messages"):
-                    email_data["subject"] = email_data["messages"][0].get("subject", "No Subject")
-                
-                return {"success": True, "data": email_data}
+        data = _extract_mcp_json(result)
+        if data is not None:
+            if not data.get("success"):
+                raise HTTPException(status_code=404, detail=data.get("error"))
+
+            # Map 'thread' to 'messages' for frontend compatibility
+            email_data = data.get("data", {})
+            if "thread" in email_data and "messages" not in email_data:
+                email_data["messages"] = email_data["thread"]
+
+            # Also extract subject from first message if not present
+            if not email_data.get("subject") and email_data.get("messages"):
+                email_data["subject"] = email_data["messages"][0].get("subject", "No Subject")
+
+            response = {"success": True, "data": email_data}
+            _email_cache_put(("thread", thread_id), response, generation)
+            return response
         
         # Fallback
         return result
@@ -527,8 +850,26 @@ async def get_email_thread(thread_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def fetch_email_context(thread_id: str):
+    """
+    Load the email thread the agent should respond to.
+    
+    Raises HTTPException(404) if the MCP server doesn't know the thread.
+    """
+    email_result = await call_mcp_tool("get_email_thread", {"thread_id": thread_id})
+    
+    # Extract email data
+    email_data = _extract_mcp_json(email_result)
+    if email_data is not None:
+        if not email_data.get("success"):
+            raise HTTPException(status_code=404, detail=email_data.get("error"))
+        return email_data.get("data")
+    
+    return email_result
+
+
 @app.post("/api/generate")
-async def generate_response(request: Dict[str, Any]):
+async def generate_response(request: GenerateRequest):
     """
     PLACEHOLDER: Generate AI response for an email.
     
@@ -544,46 +885,106 @@ async def generate_response(request: Dict[str, Any]):
     Returns:
         Generated response with category, draft, and metadata
     """
-    logger.info(f"POST /api/generate called with request: {request}")
+    logger.info("POST /api/generate called with request: %s", request)
     
     try:
-        thread_id = request.get("thread_id")
-        brand_id = request.get("brand_id", "perplexity")
+        thread_id = request.thread_id
+        brand_id = request.brand_id
         
         if not thread_id:
             raise HTTPException(status_code=400, detail="thread_id is required")
         
-        # Get email thread
-        session = app.state.mcp_session
-        email_result = await session.call_tool("get_email_thread", {"thread_id": thread_id})
-        
-        # Extract email data
-        if hasattr(email_result, 'content') and len(email_result.content) > 0:
-            content_item = email_result.content[0]
-            if hasattr(content_item, 'text'):
-                email_data = json.loads(content_item.text)
-                if not email_data.get("success"):
-                    raise HTTPException(status_code=404, detail=email_data.get("error"))
-                email_context = email_data.get("data")
-            else:
-                email_context = email_result
-        else:
-            email_context = email_result
+        email_context = await fetch_email_context(thread_id)
         
-        # Call agent orchestrator (placeholder for Day 1)
-        result = await agent_orchestrator(email_context, brand_id)
+        # Call agent orchestrator (bounded so a stuck LLM/tool loop can't hold the request)
+        result = await asyncio.wait_for(
+            agent_orchestrator(email_context, brand_id),
+            timeout=config.AGENT_TIMEOUT_SECONDS
+        )
         
         return result
         
     except HTTPException:
         raise
+    except asyncio.TimeoutError as e:
+        # Tool timeouts carry their own message; the orchestrator-level one doesn't
+        detail = str(e) or f"Agent timed out after {config.AGENT_TIMEOUT_SECONDS}s"
+        logger.error(f"⏱️ {detail}")
+        raise HTTPException(status_code=504, detail=detail)
+    except Exception as e:
+        logger.error(f"Error generating response: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/generate/stream")
+async def generate_response_stream(request: GenerateRequest):
+    """
+    Streaming variant of /api/generate (newline-delimited JSON).
+    
+    Expected request body: same as /api/generate
+    
+    Emits one JSON object per line:
+        {"type": "delta", "content": "..."}   - draft tokens as they are written
+        {"type": "reset"}                     - discard the deltas received so far
+        {"type": "result", ...}               - same payload /api/generate returns
+        {"type": "error", "detail": "..."}    - if the agent fails mid-stream
+    """
+    logger.info("POST /api/generate/stream called with request: %s", request)
+    
+    thread_id = request.thread_id
+    brand_id = request.brand_id
+    
+    if not thread_id:
+        raise HTTPException(status_code=400, detail="thread_id is required")
+    
+    # Resolve the thread up front so a bad thread_id is still a plain 404
+    try:
+        email_context = await fetch_email_context(thread_id)
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating response: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def on_content_delta(text: str):
+        await events.put({"type": "delta", "content": text})
+    
+    async def on_content_reset():
+        await events.put({"type": "reset"})
+    
+    async def run_agent():
+        try:
+            result = await asyncio.wait_for(
+                agent_orchestrator(email_context, brand_id, on_content_delta, on_content_reset),
+                timeout=config.AGENT_TIMEOUT_SECONDS
+            )
+            await events.put({"type": "result", **result})
+        except asyncio.TimeoutError:
+            logger.error(f"⏱️ Agent timed out after {config.AGENT_TIMEOUT_SECONDS}s")
+            await events.put({"type": "error", "detail": f"Agent timed out after {config.AGENT_TIMEOUT_SECONDS}s"})
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            await events.put({"type": "error", "detail": str(e)})
+        finally:
+            await events.put(None)
+    
+    async def event_stream():
+        agent_task = asyncio.create_task(run_agent())
+        try:
+            while (event := await events.get()) is not None:
+                yield orjson.dumps(event) + b"\n"
+        finally:
+            agent_task.cancel()  # No-op if finished; stops the agent if the client disconnected
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
 
 
 @app.post("/api/send")
-async def send_reply_endpoint(request: Dict[str, Any]):
+async def send_reply_endpoint(request: SendRequest):
     """
     Send/approve a response to an email thread.
     
@@ -599,31 +1000,27 @@ async def send_reply_endpoint(request: Dict[str, Any]):
     logger.info(f"POST /api/send called")
     
     try:
-        thread_id = request.get("thread_id")
-        content = request.get("content")
+        thread_id = request.thread_id
+        content = request.content
         
         if not thread_id or not content:
             raise HTTPException(status_code=400, detail="thread_id and content are required")
         
-        session = app.state.mcp_session
-        
-        # Send reply via MCP tool
-        send_result = await session.call_tool("send_reply", {
+        # Send reply via MCP tool (call_mcp_tool invalidates the email cache)
+        send_result = await call_mcp_tool("send_reply", {
             "thread_id": thread_id,
             "content": content
         })
+        data = _extract_mcp_json(send_result)
         
-        # Mark as processed
-        mark_result = await session.call_tool("mark_as_processed", {
-            "thread_id": thread_id
-        })
+        # Mark as processed only once the reply actually went out
+        if data is not None and data.get("success"):
+            await call_mcp_tool("mark_as_processed", {
+                "thread_id": thread_id
+            })
         
-        # Extract results
-        if hasattr(send_result, 'content') and len(send_result.content) > 0:
-            content_item = send_result.content[0]
-            if hasattr(content_item, 'text'):
-                data = json.loads(content_item.text)
-                return data
+        if data is not None:
+            return data
         
         return send_result
         
@@ -635,6 +1032,7 @@ async def send_reply_endpoint(request: Dict[str, Any]):
 # ========== MAIN ENTRY POINT ==========
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
     
     logger.info(f"Starting server on {config.FASTAPI_HOST}:{config.FASTAPI_PORT}")
@@ -644,6 +1042,8 @@ if __name__ == "__main__":
         host=config.FASTAPI_HOST,
         port=config.FASTAPI_PORT,
         reload=True,
-        log_level="info"
+        log_level="info",
+        # libuv-backed event loop for faster MCP stdio + OpenAI I/O (no uvloop on Windows)
+        loop="asyncio" if sys.platform == "win32" else "uvloop"
     )
 
@@ -37,12 +37,16 @@ CORS_ORIGINS = [
 
 # YouTube API Configuration
 YOUTUBE_CACHE_DURATION_HOURS = 24
+EMAIL_CACHE_TTL_SECONDS = 10  # Backend cache for /api/emails reads (UI polling)
+EMAIL_CACHE_MAX_ENTRIES = 256
+EMAIL_LIST_MAX_LIMIT = 100  # /api/emails?limit= is clamped to this (also bounds cache keys)
 YOUTUBE_API_SERVICE_NAME = "youtube"
 YOUTUBE_API_VERSION = "v3"
 
 # Agent Configuration
 MAX_AGENT_ITERATIONS = 5
 AGENT_TIMEOUT_SECONDS = 45
+TOOL_TIMEOUT_SECONDS = 15
 DEFAULT_LLM_MODEL = "gpt-4o"
 
 # Logging Configuration
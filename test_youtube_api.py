@@ -7,6 +7,7 @@ to verify the API is working correctly and fallback logic is sound.
 
 import asyncio
 import json
+import time
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 import sys
@@ -62,17 +63,26 @@ async def test_youtube_api():
 
             results = []
 
-            for channel in TEST_CHANNELS:
+            # Call MCP tool for all channels at once (one wait instead of one per channel)
+            start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    session.call_tool("fetch_channel_data", {"channel_url": channel["url"]})
+                    for channel in TEST_CHANNELS
+                ),
+                return_exceptions=True
+            )
+            elapsed = time.perf_counter() - start
+            print(f"⏱️  Fetched {len(TEST_CHANNELS)} channels concurrently in {elapsed:.2f}s\n")
+
+            for channel, result in zip(TEST_CHANNELS, responses):
                 print(f"Testing: {channel['name']}")
                 print(f"URL: {channel['url']}")
                 print("-" * 70)
 
                 try:
-                    # Call MCP tool
-                    result = await session.call_tool(
-                        "fetch_channel_data",
-                        {"channel_url": channel["url"]}
-                    )
+                    if isinstance(result, BaseException):
+                        raise result
 
                     # Parse result
                     if hasattr(result, 'content') and len(result.content) > 0:
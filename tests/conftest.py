@@ -0,0 +1,61 @@
+"""
+Dreamwell Agent - Shared Test Fixtures
+
+Fixture files are parsed once per test session; tests only read them.
+"""
+
+import sys
+from pathlib import Path
+
+import orjson
+import pytest
+import pytest_asyncio
+
+ROOT_DIR = Path(__file__).parent.parent
+DATA_DIR = ROOT_DIR / "data"
+BACKEND_URL = "http://localhost:8000"
+
+# Make the app modules (mcp_server, backend_main) importable from the test modules
+sys.path.insert(0, str(ROOT_DIR))
+
+
+@pytest.fixture(scope="session")
+def email_fixtures():
+    """Load email fixtures"""
+    return orjson.loads((DATA_DIR / "email_fixtures.json").read_bytes())
+
+
+@pytest.fixture(scope="session")
+def youtube_profiles():
+    """Load YouTube profiles"""
+    return orjson.loads((DATA_DIR / "youtube_profiles.json").read_bytes())
+
+
+@pytest.fixture(scope="session")
+def brand_profiles():
+    """Load brand profiles"""
+    return orjson.loads((DATA_DIR / "brand_profiles.json").read_bytes())
+
+
+@pytest_asyncio.fixture(scope="session")
+async def http_session():
+    """One keep-alive aiohttp session (connection pool) shared by the API tests"""
+    import aiohttp
+    
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=16, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        yield session
+
+
+@pytest_asyncio.fixture(scope="session")
+async def backend_up(http_session):
+    """Probe /api/health once; skip every backend-dependent test if it's down"""
+    import aiohttp
+    
+    try:
+        async with http_session.get(
+            f"{BACKEND_URL}/api/health", timeout=aiohttp.ClientTimeout(total=1)
+        ) as resp:
+            resp.raise_for_status()
+    except Exception as e:
+        pytest.skip(f"Backend not reachable at {BACKEND_URL}: {e}")
@@ -0,0 +1,286 @@
+"""
+Dreamwell Agent - Backend Unit Tests
+
+Tests backend_main helpers directly against a fake MCP session and a
+scripted OpenAI stream (no uvicorn, MCP subprocess or OpenAI key needed)
+"""
+
+import pytest
+import asyncio
+import orjson
+from itertools import zip_longest
+from mcp.types import CallToolResult, TextContent
+from openai.types.chat import ChatCompletionChunk
+
+import config
+from backend_main import (
+    app,
+    openai_client,
+    email_cache,
+    list_emails,
+    get_email_thread,
+    send_reply_endpoint,
+    SendRequest,
+    GenerateRequest,
+    generate_response_stream,
+    stream_chat_completion,
+    agent_orchestrator,
+    derive_category,
+)
+
+
+class FakeMCPSession:
+    """Stands in for app.state.mcp_session: records tool calls, answers from handlers"""
+
+    def __init__(self, handlers):
+        self.handlers = handlers  # tool name -> fn(arguments) returning a payload (or awaitable)
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append(name)
+        payload = self.handlers[name](arguments)
+        if asyncio.iscoroutine(payload):
+            payload = await payload
+        return CallToolResult(content=[TextContent(type="text", text=orjson.dumps(payload).decode())])
+
+
+def chunk(content=None, tool_calls=None):
+    """One streamed chat.completion.chunk carrying a content and/or tool-call delta"""
+    delta = {}
+    if content:
+        delta["content"] = content
+    if tool_calls:
+        delta["tool_calls"] = tool_calls
+    return ChatCompletionChunk.model_validate({
+        "id": "chatcmpl-test", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+    })
+
+
+def tool_call_chunks(index, call_id, name, arguments, size=8):
+    """A tool call as the API streams it: id + name first, then argument fragments"""
+    chunks = [chunk(tool_calls=[{"index": index, "id": call_id, "type": "function",
+                                 "function": {"name": name, "arguments": ""}}])]
+    for start in range(0, len(arguments), size):
+        chunks.append(chunk(tool_calls=[{"index": index, "function": {"arguments": arguments[start:start + size]}}]))
+    return chunks
+
+
+class FakeCompletions:
+    """Stands in for openai_client.chat.completions: replays one scripted stream per create()"""
+
+    def __init__(self, turns):
+        self.turns = list(turns)
+        self.messages = []  # snapshot of the messages sent with each create()
+        self.consumed = 0   # chunks read from the current stream so far
+
+    async def create(self, **kwargs):
+        self.messages.append(list(kwargs["messages"]))
+        chunks = self.turns.pop(0)
+        self.consumed = 0
+
+        async def stream():
+            for c in chunks:
+                self.consumed += 1
+                yield c
+
+        return stream()
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Install scripted completions: fake_openai(turn1_chunks, turn2_chunks, ...)"""
+    def install(*turns):
+        completions = FakeCompletions(turns)
+        monkeypatch.setattr(openai_client.chat.completions, "create", completions.create)
+        return completions
+    return install
+
+
+@pytest.fixture
+def mcp_session(monkeypatch):
+    """Fake MCP session on app.state, with an empty email cache"""
+    session = FakeMCPSession({
+        "get_latest_emails": lambda args: {"success": True, "data": [{"thread_id": "thread_001"}]},
+        "get_email_thread": lambda args: {"success": True, "data": {"thread_id": args["thread_id"], "thread": [{"subject": "Hi"}]}},
+        "send_reply": lambda args: {"success": True},
+        "mark_as_processed": lambda args: {"success": True},
+        "calculate_offer_price": lambda args: {"success": True, "recommendation": {"offer_price": 1500}},
+    })
+    monkeypatch.setattr(app.state, "mcp_session", session, raising=False)
+    monkeypatch.setattr(app.state, "openai_tools", [], raising=False)
+    email_cache.clear()
+    yield session
+    email_cache.clear()
+
+
+class TestEmailCache:
+    """Test the /api/emails read cache and its invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_reads_are_cached(self, mcp_session):
+        """Test repeat reads are served without another MCP call"""
+        await list_emails(limit=10)
+        await list_emails(limit=10)
+        await get_email_thread("thread_001")
+        await get_email_thread("thread_001")
+
+        assert mcp_session.calls == ["get_latest_emails", "get_email_thread"]
+
+    @pytest.mark.asyncio
+    async def test_send_invalidates_thread_and_lists(self, mcp_session):
+        """Test /api/send drops the cached thread and email lists"""
+        await list_emails(limit=10)
+        await list_emails(limit=5)
+        await get_email_thread("thread_001")
+
+        await send_reply_endpoint(SendRequest(thread_id="thread_001", content="Thanks!"))
+        assert email_cache == {}
+
+        await list_emails(limit=10)
+        await get_email_thread("thread_001")
+        assert mcp_session.calls[-2:] == ["get_latest_emails", "get_email_thread"]
+
+    @pytest.mark.asyncio
+    async def test_failed_send_is_not_marked_processed(self, mcp_session):
+        """Test a rejected reply doesn't mark the thread processed"""
+        mcp_session.handlers["send_reply"] = lambda args: {"success": False, "error": "Thread not found"}
+
+        result = await send_reply_endpoint(SendRequest(thread_id="thread_999", content="Thanks!"))
+
+        assert result["success"] is False
+        assert mcp_session.calls == ["send_reply"]
+
+    @pytest.mark.asyncio
+    async def test_read_in_flight_during_write_is_not_cached(self, mcp_session):
+        """Test a listing fetched before a send can't be cached after it"""
+        release = asyncio.Event()
+
+        async def slow_listing(args):
+            await release.wait()
+            return {"success": True, "data": [{"thread_id": "thread_001", "status": "unread"}]}
+
+        mcp_session.handlers["get_latest_emails"] = slow_listing
+        read = asyncio.create_task(list_emails(limit=10))
+        while "get_latest_emails" not in mcp_session.calls:
+            await asyncio.sleep(0)
+
+        await send_reply_endpoint(SendRequest(thread_id="thread_001", content="Thanks!"))
+        release.set()
+
+        # The in-flight caller still gets its (stale) listing, but nobody after it does
+        assert (await read)["data"][0]["status"] == "unread"
+        assert ("emails", 10) not in email_cache
+
+    @pytest.mark.asyncio
+    async def test_list_limit_is_clamped(self, mcp_session):
+        """Test out-of-range limits are clamped before reaching MCP (and the cache key)"""
+        limits = []
+
+        def listing(args):
+            limits.append(args["limit"])
+            return {"success": True, "data": []}
+
+        mcp_session.handlers["get_latest_emails"] = listing
+        await list_emails(limit=10_000)
+        await list_emails(limit=-5)
+
+        assert limits == [config.EMAIL_LIST_MAX_LIMIT, 0]
+        assert set(email_cache) == {("emails", config.EMAIL_LIST_MAX_LIMIT), ("emails", 0)}
+
+
+PRICE_ARGS = '{"channel_url": "https://www.youtube.com/@TechReviewAlex"}'
+BRAND_ARGS = '{"brand_id": "perplexity"}'
+NARRATION = [chunk("Let me "), chunk("check.")]
+DRAFT = [chunk("Subject: Hi"), chunk("\n\nThanks!")]
+
+
+class TestStreaming:
+    """Test streamed tool-call assembly, narration reset and NDJSON framing"""
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_rebuilt_in_order_and_dispatched_once(self, fake_openai):
+        """Test interleaved tool-call deltas come back in order, each dispatched once"""
+        price = tool_call_chunks(0, "call_a", "calculate_offer_price", PRICE_ARGS)
+        brand = tool_call_chunks(1, "call_b", "get_brand_context", BRAND_ARGS)
+        interleaved = [c for pair in zip_longest(price, brand) for c in pair if c is not None]
+        malformed = chunk(tool_calls=[{"index": 2, "id": "call_c", "type": "function",
+                                       "function": {"name": "get_brand_context", "arguments": '{"brand_id": '}}])
+        nameless = chunk(tool_calls=[{"index": 3, "function": {"arguments": "{}"}}])
+        stream = [*interleaved, malformed, nameless]
+        completions = fake_openai(stream)
+
+        dispatched = []
+        content, calls = await stream_chat_completion(
+            [], [], lambda call: dispatched.append((call["id"], completions.consumed))
+        )
+
+        assert content is None
+        assert [(c["id"], c["arguments"]) for c in calls] == [
+            ("call_a", PRICE_ARGS), ("call_b", BRAND_ARGS), ("call_c", '{"brand_id": ')
+        ]
+        # Each call goes out once: complete ones mid-stream (in the order their arguments
+        # finish), the malformed one when the stream ends; the nameless one never runs
+        assert sorted(call_id for call_id, _ in dispatched) == ["call_a", "call_b", "call_c"]
+        assert dispatched[-1] == ("call_c", len(stream))
+        assert all(at < len(stream) for _, at in dispatched[:-1])
+
+    @pytest.mark.asyncio
+    async def test_narration_is_reset_between_iterations(self, mcp_session, fake_openai):
+        """Test tool-turn narration is retracted and only the draft streams through"""
+        completions = fake_openai(
+            [*NARRATION, *tool_call_chunks(0, "call_a", "calculate_offer_price", PRICE_ARGS)],
+            DRAFT,
+        )
+        events = []
+
+        async def on_delta(text):
+            events.append(("delta", text))
+
+        async def on_reset():
+            events.append(("reset",))
+
+        result = await agent_orchestrator({"thread_id": "thread_001"}, "perplexity", on_delta, on_reset)
+
+        assert events == [("delta", "Let me "), ("delta", "check."), ("reset",),
+                          ("delta", "Subject: Hi"), ("delta", "\n\nThanks!")]
+        assert result["response_draft"] == "Subject: Hi\n\nThanks!"
+        assert result["iterations_used"] == 2
+        assert result["pricing_breakdown"]["recommended_offer"] == 1500
+        assert mcp_session.calls.count("calculate_offer_price") == 1
+
+        # Iteration 2 sees the tool call answered right after the assistant turn
+        assistant_msg, tool_msg = completions.messages[1][-2:]
+        assert assistant_msg["tool_calls"][0]["id"] == "call_a"
+        assert tool_msg["tool_call_id"] == "call_a"
+
+    @pytest.mark.asyncio
+    async def test_generate_stream_ndjson_framing(self, mcp_session, fake_openai):
+        """Test /api/generate/stream writes one JSON event per line, ending in the result"""
+        fake_openai([*NARRATION, *tool_call_chunks(0, "call_a", "calculate_offer_price", PRICE_ARGS)], DRAFT)
+
+        response = await generate_response_stream(GenerateRequest(thread_id="thread_001"))
+        lines = [line async for line in response.body_iterator]
+
+        assert response.media_type == "application/x-ndjson"
+        assert all(line.endswith(b"\n") and line.count(b"\n") == 1 for line in lines)
+        events = [orjson.loads(line) for line in lines]
+        assert [e["type"] for e in events] == ["delta", "delta", "reset", "delta", "delta", "result"]
+        assert events[-1]["response_draft"] == "Subject: Hi\n\nThanks!"
+
+
+class TestDeriveCategory:
+    """Test keyword categorisation of the final draft"""
+
+    @pytest.mark.parametrize("draft,expected", [
+        pytest.param("We accept the rate, but let's negotiate the timeline", "negotiation", id="negotiate-beats-accept"),
+        pytest.param("We must decline the bundle, though we accept the single video", "acceptance", id="accept-beats-decline"),
+        pytest.param("Unfortunately we have to DECLINE this time", "rejection", id="decline-any-case"),
+        pytest.param("Open to NEGOTIATION on deliverables", "negotiation", id="negotiation-any-case"),
+        pytest.param("Thanks for reaching out!", "response", id="no-keyword"),
+        pytest.param("", "response", id="empty"),
+        pytest.param(None, "response", id="none"),
+    ])
+    def test_derive_category(self, draft, expected):
+        """Test priority negotiation > acceptance > rejection, regardless of position"""
+        assert derive_category(draft) == expected
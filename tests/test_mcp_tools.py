@@ -5,11 +5,114 @@ Tests individual MCP tools in isolation
 """
 
 import pytest
-import json
-import sys
-import os
+import types
+from datetime import datetime, timedelta
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import httplib2
+from googleapiclient.errors import HttpError
+
+# Imported once at collection: a broken mcp_server fails the module up front
+from mcp_server import (
+    mcp,
+    get_email_thread,
+    get_latest_emails,
+    send_reply,
+    get_brand_context,
+    fetch_channel_data,
+    fetch_channels_batch,
+    calculate_engagement,
+    extract_channel_id_from_url,
+    calculate_offer_price,
+    calculate_offer_prices_batch,
+    validate_counter_offer,
+    offer_price_cache,
+    channel_metrics_cache,
+    youtube_cache,
+    channel_id_by_handle,
+    emails,
+    emails_by_recency,
+    latest_timestamp_by_thread,
+    YOUTUBE_ERROR_CACHE_MINUTES,
+    YOUTUBE_NOT_FOUND_CACHE_HOURS,
+    OFFER_PRICE_CACHE_MINUTES,
+    OFFER_PRICE_FALLBACK_CACHE_SECONDS,
+)
+
+
+def channel_item(channel_id, title="Fake Channel"):
+    """Minimal channels.list item"""
+    return {
+        "id": channel_id,
+        "statistics": {"subscriberCount": "1000", "videoCount": "10", "viewCount": "50000"},
+        "snippet": {"title": title, "description": "", "thumbnails": {"default": {"url": "https://example.com/t.jpg"}}},
+    }
+
+
+def http_error(status, message, reason="backendError"):
+    """HttpError as googleapiclient raises it, with a JSON error body"""
+    resp = httplib2.Response({"status": status})
+    content = f'{{"error": {{"message": "{message}", "errors": [{{"reason": "{reason}"}}]}}}}'
+    return HttpError(resp, content.encode())
+
+
+def assert_cached_for(cache_key, ttl):
+    """The youtube_cache entry for cache_key is a failure (data=None) expiring in ~ttl"""
+    entry = youtube_cache[cache_key]
+    assert entry["data"] is None
+    assert abs(entry["expires_at"] - (datetime.now() + ttl)) < timedelta(seconds=5)
+
+
+class FakeYouTube:
+    """Stand-in for the googleapiclient Resource: records list() calls, replays canned responses"""
+    
+    def __init__(self):
+        self.calls = []
+        self.responses = {}  # "channels" / "search" -> response dict
+        self.error = None    # Raised by execute() when set
+    
+    def channels(self):
+        return self._resource("channels")
+    
+    def search(self):
+        return self._resource("search")
+    
+    def _resource(self, name):
+        def list_(**kwargs):
+            self.calls.append((name, kwargs))
+            return types.SimpleNamespace(execute=lambda: self._execute(name))
+        return types.SimpleNamespace(list=list_)
+    
+    def _execute(self, name):
+        if self.error is not None:
+            raise self.error
+        return self.responses.get(name, {"items": []})
+
+
+@pytest.fixture
+def fake_youtube(monkeypatch):
+    """API key set, a FakeYouTube client, and empty API caches for the test"""
+    fake = FakeYouTube()
+    monkeypatch.setattr("mcp_server.YOUTUBE_API_KEY", "test-key")
+    monkeypatch.setattr("mcp_server.youtube_quota_blocked_until", None)
+    monkeypatch.setattr("mcp_server.get_youtube_client", lambda: fake)
+    youtube_cache.clear()
+    channel_id_by_handle.clear()
+    yield fake
+    youtube_cache.clear()
+    channel_id_by_handle.clear()
+
+
+@pytest.fixture
+def restore_threads():
+    """Undo send_reply's in-memory changes (thread messages, recency index) after the test"""
+    threads = {email["thread_id"]: list(email["thread"]) for email in emails}
+    latest = dict(latest_timestamp_by_thread)
+    recency = list(emails_by_recency)
+    yield
+    for email in emails:
+        email["thread"][:] = threads[email["thread_id"]]
+    latest_timestamp_by_thread.update(latest)
+    emails_by_recency[:] = recency
 
 
 class TestEmailTools:
@@ -17,8 +120,6 @@ class TestEmailTools:
     
     def test_get_email_thread_exists(self):
         """Test fetching existing email thread"""
-        from mcp_server import get_email_thread
-        
         result = get_email_thread("thread_001")
         
         assert result["success"] == True
@@ -28,8 +129,6 @@ class TestEmailTools:
     
     def test_get_email_thread_not_found(self):
         """Test fetching non-existent thread"""
-        from mcp_server import get_email_thread
-        
         result = get_email_thread("nonexistent_thread")
         
         assert result["success"] == False
@@ -37,8 +136,6 @@ class TestEmailTools:
     
     def test_get_latest_emails_default(self):
         """Test listing emails with default limit"""
-        from mcp_server import get_latest_emails
-        
         result = get_latest_emails()
         
         assert result["success"] == True
@@ -46,12 +143,26 @@ class TestEmailTools:
     
     def test_get_latest_emails_custom_limit(self):
         """Test listing emails with custom limit"""
-        from mcp_server import get_latest_emails
-        
         result = get_latest_emails(limit=5)
         
         assert result["success"] == True
         assert len(result["data"]) <= 5
+    
+    def test_send_reply_moves_thread_to_front(self, restore_threads):
+        """Test a reply to the oldest thread makes it the newest, without duplicating it"""
+        oldest = get_latest_emails(limit=len(emails))["data"][-1]["thread_id"]
+        
+        sent = send_reply(oldest, "Thanks, sounds good!")
+        newest = get_latest_emails(limit=3)["data"][0]
+        assert newest["thread_id"] == oldest
+        assert newest["latest_message_time"] == sent["sent_at"]
+        
+        # A second reply re-keys the same entry instead of adding another
+        send_reply(oldest, "One more thing")
+        thread_ids = [email["thread_id"] for email in get_latest_emails(limit=len(emails))["data"]]
+        assert thread_ids[0] == oldest
+        assert len(emails_by_recency) == len(emails)
+        assert sorted(thread_ids) == sorted(email["thread_id"] for email in emails)
 
 
 class TestBrandTools:
@@ -59,8 +170,6 @@ class TestBrandTools:
     
     def test_get_brand_context_perplexity(self):
         """Test fetching Perplexity brand context"""
-        from mcp_server import get_brand_context
-        
         result = get_brand_context("perplexity")
         
         assert result["success"] == True
@@ -69,8 +178,6 @@ class TestBrandTools:
     
     def test_get_brand_context_not_found(self):
         """Test fetching non-existent brand"""
-        from mcp_server import get_brand_context
-        
         result = get_brand_context("nonexistent_brand")
         
         assert result["success"] == False
@@ -81,8 +188,6 @@ class TestYouTubeTools:
     
     def test_fetch_channel_data_fallback(self):
         """Test fetching channel data (uses fallback)"""
-        from mcp_server import fetch_channel_data
-        
         result = fetch_channel_data("https://www.youtube.com/@TechReviewAlex")
         
         assert result["success"] == True
@@ -91,21 +196,92 @@ class TestYouTubeTools:
     
     def test_fetch_channel_data_not_found(self):
         """Test fetching non-existent channel"""
-        from mcp_server import fetch_channel_data
-        
         result = fetch_channel_data("https://www.youtube.com/@NonexistentChannel12345")
         
         # Without API key, this should fail as it won't be in local data
         assert result["success"] == False
     
+    def test_fetch_channels_batch(self):
+        """Test batch fetch returns one result per input URL"""
+        urls = ["https://www.youtube.com/@TechReviewAlex", "https://www.youtube.com/@NonexistentChannel12345"]
+        result = fetch_channels_batch(urls)
+        
+        assert result["success"] == True
+        assert list(result["channels"]) == urls
+        assert result["channels"][urls[0]]["success"] == True
+        assert result["channels"][urls[1]]["success"] == False
+    
     def test_calculate_engagement(self):
         """Test engagement calculation"""
-        from mcp_server import calculate_engagement
-        
         result = calculate_engagement("UCtech_alex")
         
         assert result["success"] == True
         assert "engagement_rate" in result
+    
+    def test_extract_channel_id_from_url(self):
+        """Test handle / channel ID extraction across URL forms"""
+        assert extract_channel_id_from_url("https://www.youtube.com/@TechReviewAlex") == "@TechReviewAlex"
+        assert extract_channel_id_from_url("https://www.youtube.com/@TechReviewAlex/videos?si=x") == "@TechReviewAlex"
+        assert extract_channel_id_from_url("@mkbhd") == "@mkbhd"
+        assert extract_channel_id_from_url("https://www.youtube.com/c/veritasium") == "c/veritasium"
+        assert extract_channel_id_from_url("https://www.youtube.com/user/marquesbrownlee") == "user/marquesbrownlee"
+        assert extract_channel_id_from_url(
+            "https://www.youtube.com/channel/UCBJycsmduvYEL83R_U4JriQ"
+        ) == "UCBJycsmduvYEL83R_U4JriQ"
+        assert extract_channel_id_from_url("UCtech_alex") == "UCtech_alex"
+
+
+class TestYouTubeAPIPaths:
+    """Test fetch_channel_data's API lookups against a stubbed client"""
+    
+    def test_legacy_user_url_resolves_by_username(self, fake_youtube):
+        """Test /user/ URLs use forUsername, not forHandle"""
+        fake_youtube.responses["channels"] = {"items": [channel_item("UC_legacy_user")]}
+        result = fetch_channel_data("https://www.youtube.com/user/OldName")
+        
+        assert result["source"] == "api"
+        assert result["data"]["channel_id"] == "UC_legacy_user"
+        assert [(name, kwargs.get("forUsername")) for name, kwargs in fake_youtube.calls] == [("channels", "OldName")]
+        assert all("forHandle" not in kwargs for _, kwargs in fake_youtube.calls)
+    
+    def test_legacy_custom_url_resolves_by_search(self, fake_youtube):
+        """Test /c/ URLs search for the name, then fetch that channel ID"""
+        fake_youtube.responses["search"] = {"items": [{"snippet": {"channelId": "UC_custom_name"}}]}
+        fake_youtube.responses["channels"] = {"items": [channel_item("UC_custom_name")]}
+        result = fetch_channel_data("https://www.youtube.com/c/CustomName")
+        
+        assert result["data"]["channel_id"] == "UC_custom_name"
+        assert [name for name, _ in fake_youtube.calls] == ["search", "channels"]
+        assert fake_youtube.calls[0][1]["q"] == "CustomName"
+        assert fake_youtube.calls[1][1]["id"] == "UC_custom_name"
+    
+    def test_http_error_backs_off_to_local_data(self, fake_youtube):
+        """Test an HttpError is cached for YOUTUBE_ERROR_CACHE_MINUTES and the retry skips the API"""
+        fake_youtube.error = http_error(500, "Backend Error")
+        first = fetch_channel_data("https://www.youtube.com/@TechReviewAlex")
+        second = fetch_channel_data("https://www.youtube.com/@TechReviewAlex")
+        
+        assert first["source"] == second["source"] == "local_fallback"
+        assert len(fake_youtube.calls) == 1
+        assert_cached_for("@techreviewalex", timedelta(minutes=YOUTUBE_ERROR_CACHE_MINUTES))
+    
+    def test_missing_channel_is_negative_cached(self, fake_youtube):
+        """Test empty items are cached for YOUTUBE_NOT_FOUND_CACHE_HOURS and the retry skips the API"""
+        first = fetch_channel_data("https://www.youtube.com/@NoSuchChannel")
+        second = fetch_channel_data("https://www.youtube.com/@NoSuchChannel")
+        
+        assert first["success"] == second["success"] == False
+        assert len(fake_youtube.calls) == 1
+        assert_cached_for("@nosuchchannel", timedelta(hours=YOUTUBE_NOT_FOUND_CACHE_HOURS))
+    
+    def test_quota_error_blocks_every_channel(self, fake_youtube):
+        """Test a quota 403 stops API calls for other channels too"""
+        fake_youtube.error = http_error(403, "You have exceeded your quota.", reason="quotaExceeded")
+        fetch_channel_data("https://www.youtube.com/@TechReviewAlex")
+        result = fetch_channel_data("https://www.youtube.com/@NoSuchChannel")
+        
+        assert result["success"] == False
+        assert len(fake_youtube.calls) == 1
 
 
 class TestPricingTools:
@@ -113,8 +289,6 @@ class TestPricingTools:
     
     def test_calculate_offer_price(self):
         """Test offer price calculation"""
-        from mcp_server import calculate_offer_price
-        
         result = calculate_offer_price(
             "https://www.youtube.com/@TechReviewAlex",
             "integration",
@@ -129,10 +303,44 @@ class TestPricingTools:
         assert "estimated_total_price" in calc
         assert calc["estimated_total_price"] > 0
     
+    def test_calculate_offer_prices_batch(self):
+        """Test batch pricing matches single-channel pricing"""
+        urls = ["https://www.youtube.com/@TechReviewAlex", "https://www.youtube.com/@NonexistentChannel12345"]
+        result = calculate_offer_prices_batch(urls, "integration", "perplexity")
+        
+        assert result["success"] == True
+        assert result["prices"][urls[1]]["success"] == False
+        
+        # The batch filled the caches: re-price from scratch for an independent reference
+        offer_price_cache.clear()
+        channel_metrics_cache.clear()
+        reference = calculate_offer_price(urls[0], "integration", "perplexity")
+        
+        assert reference is not result["prices"][urls[0]]
+        assert result["prices"][urls[0]] == reference
+    
+    def test_price_cache_ttl_depends_on_source(self, fake_youtube):
+        """Test local-fallback prices expire quickly, API prices last OFFER_PRICE_CACHE_MINUTES"""
+        fallback_url = "https://www.youtube.com/@TechReviewAlex"
+        api_url = "https://www.youtube.com/channel/UC" + "a" * 22
+        fake_youtube.error = Exception("API down")  # Falls back to local data
+        offer_price_cache.clear()
+        channel_metrics_cache.clear()
+        
+        calculate_offer_price(fallback_url, "integration", "perplexity")
+        fake_youtube.error = None
+        fake_youtube.responses["channels"] = {"items": [channel_item("UC" + "a" * 22)]}
+        calculate_offer_price(api_url, "integration", "perplexity")
+        
+        now = datetime.now()
+        assert offer_price_cache[fallback_url]["expires_at"] <= now + timedelta(seconds=OFFER_PRICE_FALLBACK_CACHE_SECONDS)
+        assert offer_price_cache[api_url]["expires_at"] > now + timedelta(minutes=OFFER_PRICE_CACHE_MINUTES - 1)
+        
+        offer_price_cache.clear()
+        channel_metrics_cache.clear()
+    
     def test_validate_counter_offer_accept(self):
         """Test counter-offer validation (should accept)"""
-        from mcp_server import validate_counter_offer
-        
         result = validate_counter_offer(
             "https://www.youtube.com/@TechReviewAlex",
             1000.0,  # Original
@@ -144,8 +352,6 @@ class TestPricingTools:
     
     def test_validate_counter_offer_negotiate(self):
         """Test counter-offer validation (should negotiate)"""
-        from mcp_server import validate_counter_offer
-        
         result = validate_counter_offer(
             "https://www.youtube.com/@TechReviewAlex",
             1000.0,  # Original
@@ -157,8 +363,6 @@ class TestPricingTools:
     
     def test_validate_counter_offer_decline(self):
         """Test counter-offer validation (should decline)"""
-        from mcp_server import validate_counter_offer
-        
         result = validate_counter_offer(
             "https://www.youtube.com/@TechReviewAlex",
             1000.0,  # Original
@@ -168,6 +372,15 @@ class TestPricingTools:
         assert result["success"] == True
         assert result["analysis"]["recommendation"] == "decline"
 
+    @pytest.mark.asyncio
+    async def test_tools_are_plain_functions(self):
+        """Test registered tools stay directly callable for in-process chaining"""
+        tool_names = {tool.name for tool in await mcp.list_tools()}
+        
+        for fn in (calculate_offer_price, fetch_channel_data):
+            assert isinstance(fn, types.FunctionType)
+            assert fn.__name__ in tool_names
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -3,10 +3,11 @@ Dreamwell YouTube API Setup Verification Script (Python version)
 Cross-platform alternative to verify_api_setup.sh
 """
 
+import importlib.util
 import os
 import sys
 import json
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -22,6 +23,30 @@ def check_mark(passed):
     return "✓" if passed else "✗"
 
 
+def load_data_file(data_files, filename, noun, issues):
+    """Parse and report one data/ fixture; returns its contents, or None if missing"""
+    path = data_files.get(filename)
+    if path is None:
+        print(f"   {check_mark(False)} {filename} not found")
+        issues.append(f"Missing {filename}")
+        return None
+
+    with open(path, "r") as f:
+        data = json.load(f)
+    print(f"   {check_mark(True)} {filename} found ({len(data)} {noun})")
+    return data
+
+
+def parse_env(lines):
+    """Parse KEY=value lines of a .env file in one pass (first occurrence wins)"""
+    env = {}
+    for line in lines:
+        if "=" in line and not line.lstrip().startswith("#"):
+            key, _, value = line.partition("=")
+            env.setdefault(key.strip(), value.strip())
+    return env
+
+
 def main():
     print_header("Dreamwell YouTube API Setup Verification")
 
@@ -36,14 +61,10 @@ def main():
         print(f"   {check_mark(True)} .env file exists")
 
         with open(env_path) as f:
-            env_content = f.read()
+            env = parse_env(f)  # Streams line by line, no full read + split
 
         # Check YouTube API key
-        youtube_key = None
-        for line in env_content.split("\n"):
-            if line.startswith("YOUTUBE_API_KEY="):
-                youtube_key = line.split("=", 1)[1].strip()
-                break
+        youtube_key = env.get("YOUTUBE_API_KEY")
 
         if not youtube_key:
             print(f"   {check_mark(False)} YOUTUBE_API_KEY is empty in .env")
@@ -60,11 +81,7 @@ def main():
             print(f"      Key: {youtube_key[:20]}...")
 
         # Check OpenAI key
-        openai_key = None
-        for line in env_content.split("\n"):
-            if line.startswith("OPENAI_API_KEY="):
-                openai_key = line.split("=", 1)[1].strip()
-                break
+        openai_key = env.get("OPENAI_API_KEY")
 
         if not openai_key:
             print(f"   {check_mark(False)} OPENAI_API_KEY is empty in .env")
@@ -85,98 +102,111 @@ def main():
     # 2. Check if backend is running
     print("\n2. Checking if backend is running...")
     try:
-        response = requests.get("http://localhost:8000/", timeout=2)
-        if response.status_code == 200:
-            print(f"   {check_mark(True)} Backend is running on http://localhost:8000")
-
-            # 3. Test health endpoint
-            print("\n3. Testing API health endpoint...")
-            health_response = requests.get("http://localhost:8000/api/health", timeout=2)
-
-            if health_response.status_code == 200:
-                health_data = health_response.json()
-                print(f"   {check_mark(True)} Health endpoint responding")
+        import httpx  # Optional (see requirements.txt); only this probe needs it
+    except ImportError:
+        httpx = None
 
-                # YouTube API status
-                youtube_status = health_data["components"]["youtube_api"]["status"]
-                will_use = health_data["components"]["youtube_api"]["will_use"]
-
-                if youtube_status == "configured":
-                    print(f"   {check_mark(True)} YouTube API: configured")
-                    print(f"      Will use: {will_use}")
-                else:
-                    print(f"   ⚠ YouTube API: not configured")
-                    print(f"      Will use: local_fallback")
-
-                # MCP status
-                mcp_status = health_data["components"]["mcp_server"]["status"]
-                tool_count = health_data["components"]["mcp_server"]["tools_available"]
-
-                if mcp_status == "up":
-                    print(f"   {check_mark(True)} MCP Server: running ({tool_count} tools available)")
+    if httpx is None:
+        print(f"   ⚠ httpx not installed; skipping backend checks")
+        print(f"      → Run: pip install -r requirements.txt")
+        issues.append("Install httpx to check the backend")
+        all_good = False
+    else:
+        # One keep-alive client for all backend probes. uvicorn serves plain HTTP/1.1 on
+        # localhost (no h2c), so http2 stays off; httpx.Client is safe to share across threads
+        session = httpx.Client(
+            http2=False,
+            timeout=2.0,
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=5.0),
+        )
+        # Probe / and /api/health at the same time: worst case is one timeout, not two
+        pool = ThreadPoolExecutor(max_workers=2)
+        root_future = pool.submit(session.get, "http://localhost:8000/")
+        health_future = pool.submit(session.get, "http://localhost:8000/api/health")
+        try:
+            response = root_future.result()
+            if response.status_code == 200:
+                print(f"   {check_mark(True)} Backend is running on http://localhost:8000")
+
+                # 3. Test health endpoint
+                print("\n3. Testing API health endpoint...")
+                health_response = health_future.result()
+
+                if health_response.status_code == 200:
+                    health_data = health_response.json()
+                    print(f"   {check_mark(True)} Health endpoint responding")
+
+                    # YouTube API status
+                    youtube_status = health_data["components"]["youtube_api"]["status"]
+                    will_use = health_data["components"]["youtube_api"]["will_use"]
+
+                    if youtube_status == "configured":
+                        print(f"   {check_mark(True)} YouTube API: configured")
+                        print(f"      Will use: {will_use}")
+                    else:
+                        print(f"   ⚠ YouTube API: not configured")
+                        print(f"      Will use: local_fallback")
+
+                    # MCP status
+                    mcp_status = health_data["components"]["mcp_server"]["status"]
+                    tool_count = health_data["components"]["mcp_server"]["tools_available"]
+
+                    if mcp_status == "up":
+                        print(f"   {check_mark(True)} MCP Server: running ({tool_count} tools available)")
+                    else:
+                        print(f"   {check_mark(False)} MCP Server: down")
+                        issues.append("MCP server is not running")
+                        all_good = False
                 else:
-                    print(f"   {check_mark(False)} MCP Server: down")
-                    issues.append("MCP server is not running")
+                    print(f"   {check_mark(False)} Health endpoint not responding")
+                    issues.append("Health endpoint error")
                     all_good = False
             else:
-                print(f"   {check_mark(False)} Health endpoint not responding")
-                issues.append("Health endpoint error")
+                print(f"   {check_mark(False)} Backend responded with status {response.status_code}")
+                issues.append("Backend not healthy")
                 all_good = False
-        else:
-            print(f"   {check_mark(False)} Backend responded with status {response.status_code}")
-            issues.append("Backend not healthy")
+        except httpx.TimeoutException:
+            print(f"   {check_mark(False)} Backend request timed out")
+            issues.append("Backend not responding")
             all_good = False
-    except requests.exceptions.ConnectionError:
-        print(f"   {check_mark(False)} Backend is not running")
-        print(f"      → Start with: python backend_main.py")
-        issues.append("Start backend server")
-        all_good = False
-    except requests.exceptions.Timeout:
-        print(f"   {check_mark(False)} Backend request timed out")
-        issues.append("Backend not responding")
-        all_good = False
+        except httpx.TransportError:
+            # Refused, reset or closed mid-response: treat all of them as not running
+            print(f"   {check_mark(False)} Backend is not running")
+            print(f"      → Start with: python backend_main.py")
+            issues.append("Start backend server")
+            all_good = False
+        finally:
+            pool.shutdown()
+            session.close()
 
     # 4. Check Python dependencies
     print("\n4. Checking Python dependencies...")
-    try:
-        import mcp
-        import openai
-        import googleapiclient
-
-        print(f"   {check_mark(True)} All Python packages installed")
-    except ImportError as e:
-        print(f"   ⚠ Some Python packages might be missing: {e}")
+    # find_spec only locates the packages; importing openai/googleapiclient just to check is slow
+    missing = [name for name in ("mcp", "openai", "googleapiclient") if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"   ⚠ Some Python packages might be missing: {', '.join(missing)}")
         print(f"      → Run: pip install -r requirements.txt")
         issues.append("Install missing Python packages")
+    else:
+        print(f"   {check_mark(True)} All Python packages installed")
 
     # 5. Check test data files
     print("\n5. Checking test data files...")
 
-    email_fixtures = Path("data/email_fixtures.json")
-    if email_fixtures.exists():
-        with open(email_fixtures) as f:
-            emails = json.load(f)
-        email_count = len(emails)
-        print(f"   {check_mark(True)} email_fixtures.json found ({email_count} emails)")
+    # List data/ once instead of probing each file separately
+    data_dir = Path("data")
+    data_files = {entry.name: entry.path for entry in os.scandir(data_dir)} if data_dir.is_dir() else {}
 
+    emails = load_data_file(data_files, "email_fixtures.json", "emails", issues)
+    if emails is not None:
         # Check for API test emails
         api_test_count = sum(1 for email in emails if "REAL API TEST" in email.get("influencer_name", ""))
         if api_test_count > 0:
             print(f"   {check_mark(True)} Found {api_test_count} test emails with real YouTube channels")
-    else:
-        print(f"   {check_mark(False)} email_fixtures.json not found")
-        issues.append("Missing email_fixtures.json")
-        all_good = False
 
-    youtube_profiles = Path("data/youtube_profiles.json")
-    if youtube_profiles.exists():
-        with open(youtube_profiles) as f:
-            profiles = json.load(f)
-        profile_count = len(profiles)
-        print(f"   {check_mark(True)} youtube_profiles.json found ({profile_count} profiles)")
-    else:
-        print(f"   {check_mark(False)} youtube_profiles.json not found")
-        issues.append("Missing youtube_profiles.json")
+    profiles = load_data_file(data_files, "youtube_profiles.json", "profiles", issues)
+
+    if emails is None or profiles is None:
         all_good = False
 
     # Final summary